@@ -1,10 +1,9 @@
 import logging
-import json
 import sys
 
+from atlantis import serialization
 from atlantis.config import Config
 from atlantis.simulators import AtlantisSimulator
-from atlantis.util import render_world
 from atlantis.world import World
 
 """
@@ -21,15 +20,20 @@ if __name__ == "__main__":
     logger = logging.getLogger()
 
     sim = AtlantisSimulator()
+    stdout = sys.stdout.buffer
 
-    for i, line in enumerate(sys.stdin):
+    # Lines are read as bytes since the json parsers accept them without a decode
+    for i, line in enumerate(iter(sys.stdin.buffer.readline, b"")):
 
         # Read from stdin and create the world
-        input = json.loads(line)
-        logger.info(f"Step: {i}: Input: {json.dumps(input)}")
+        input = serialization.loads(line)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Step: {i}: Input: {line.decode().strip()}")
 
         world = World.create_from(input)
         if config.enable_render:
+            from atlantis.util import render_world
+
             render_world(world, f"./{config.output_path}/atlantis-{i:02d}.png")
 
         # Run the simulation
@@ -37,9 +41,12 @@ if __name__ == "__main__":
         # Dump commands to json
         output = {}
         for c in commands:
-            output.update(c.to_json())
-        json_output = json.dumps(output)
-        logger.info(f"Step: {i}: Output: " + json_output.replace("'", '"'))
+            c.apply(output)
+        json_output = serialization.dumps(output)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Step: {i}: Output: {json_output.decode()}")
 
         # Write to stdout
-        print(json_output, flush=True)
+        # The harness waits for our commands before sending the next step so we still flush each line
+        stdout.write(json_output + b"\n")
+        stdout.flush()
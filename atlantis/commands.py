@@ -6,33 +6,52 @@ from .workers import WorkerId
 
 
 class Command(ABC):
+    __slots__ = ("worker_id", "pearl_id")
+
+    # lets the simulator tell the command types apart without isinstance checks
+    is_pass = False
+    # the number of consecutive steps the command is issued for
+    remaining = 1
+
     def __init__(self, worker_id: WorkerId, pearl_id: PearlId):
         self.worker_id = worker_id
         self.pearl_id = pearl_id
 
     @abstractmethod
-    def to_json(self) -> Dict:
+    def apply(self, output: Dict) -> None:
+        """
+        Adds the command to the output payload which maps worker ids to their command
+        """
         pass
 
+    def to_json(self) -> Dict:
+        output = {}
+        self.apply(output)
+        return output
+
 
 class PassCommand(Command):
+    __slots__ = ("target_worker_id",)
+    is_pass = True
+
     def __init__(
         self, worker_id: WorkerId, pearl_id: PearlId, target_worker_id: WorkerId
     ):
         super().__init__(worker_id, pearl_id)
         self.target_worker_id = target_worker_id
 
-    def to_json(self) -> Dict:
-        return {
-            self.worker_id: {
-                "Pass": {"pearl_id": self.pearl_id, "to_worker": self.target_worker_id}
-            }
+    def apply(self, output: Dict) -> None:
+        output[self.worker_id] = {
+            "Pass": {"pearl_id": self.pearl_id, "to_worker": self.target_worker_id}
         }
 
 
 class NomCommand(Command):
-    def __init__(self, worker_id: WorkerId, pearl_id: PearlId):
+    __slots__ = ("remaining",)
+
+    def __init__(self, worker_id: WorkerId, pearl_id: PearlId, remaining: int = 1):
         super().__init__(worker_id, pearl_id)
+        self.remaining = remaining
 
-    def to_json(self) -> Dict:
-        return {self.worker_id: {"Nom": self.pearl_id}}
+    def apply(self, output: Dict) -> None:
+        output[self.worker_id] = {"Nom": self.pearl_id}
@@ -1,14 +1,17 @@
-from enum import Enum
+from enum import IntEnum
 from typing import List
 
 
-class PearlColor(Enum):
-    Red = "Red"
-    Green = "Green"
-    Blue = "Blue"
+class PearlColor(IntEnum):
+    # the values index the processing rates of the workers
+    Red = 0
+    Green = 1
+    Blue = 2
 
 
 class PearlLayer:
+    __slots__ = ("color", "thickness")
+
     def __init__(self, color: PearlColor, thickness: int):
         self.color = color
         self.thickness = thickness
@@ -21,6 +24,8 @@ PearlId = int
 
 
 class Pearl:
+    __slots__ = ("id", "layers")
+
     def __init__(self, id: PearlId, layers: List[PearlLayer]):
         self.id = id
         self.layers = layers
@@ -38,6 +43,8 @@ class Pearl:
 
     @property
     def digested(self) -> bool:
-        if self.remaining_thickness:
-            return False
+        # stop at the first layer with any thickness rather than summing all of them
+        for l in self.layers:
+            if l.thickness:
+                return False
         return True
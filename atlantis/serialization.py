@@ -0,0 +1,36 @@
+"""
+JSON helpers for the stdin/stdout protocol
+orjson is used when it is installed, then ujson, and we fall back to the standard library json module otherwise
+"""
+from typing import Any, Union
+
+try:
+    import orjson
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        # worker ids are used as keys in the command output
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+except ImportError:
+    try:
+        import ujson
+
+        def loads(data: Union[bytes, str]) -> Any:
+            return ujson.loads(data)
+
+        def dumps(obj: Any) -> bytes:
+            # like json, ujson writes the worker id keys as strings
+            return ujson.dumps(obj).encode()
+
+    except ImportError:
+        import json
+
+        def loads(data: Union[bytes, str]) -> Any:
+            return json.loads(data)
+
+        def dumps(obj: Any) -> bytes:
+            return json.dumps(obj).encode()
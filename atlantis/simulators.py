@@ -2,10 +2,10 @@ import heapq
 import logging
 
 from math import inf
-from collections import defaultdict
+from collections import deque
 
 from abc import abstractmethod, ABC
-from typing import Collection, Dict, Optional, Set, List, Tuple
+from typing import Collection, Deque, Dict, Optional, List, Tuple
 
 from .commands import Command, PassCommand, NomCommand
 from .pearls import Pearl, PearlId
@@ -13,6 +13,88 @@ from .workers import Worker, WorkerId
 from .world import World
 
 
+def find_shortest_paths(
+    start_id: WorkerId,
+    end_id: WorkerId,
+    neighbor_ids: List[Tuple[WorkerId, ...]],
+    worker_costs: List[int],
+    end_hops: Optional[List[float]] = None,
+) -> Tuple[List[WorkerId], List[float]]:
+    """
+    Finds the paths from start using a simple heapq based Dijsktra implementation
+    Moving onto a worker costs 1 plus its booked cost and the search stops early once end_id is settled
+    end_hops are the hop counts from each worker to end_id which turns this into A*star
+        Every move costs at least 1 so the hop count never overestimates and the paths are still the cheapest
+        The queue is ordered by the estimate so ties between equally cheap paths can resolve to a different path
+    Everything is indexed by worker id and the returned predecessors are -1 where unset
+    """
+    worker_count = len(neighbor_ids)
+    prev: List[WorkerId] = [-1] * worker_count
+    dist: List[float] = [inf] * worker_count
+    if end_hops is None:
+        end_hops = [0] * worker_count
+
+    dist[start_id] = 0
+    # Use the estimated cost and integer id for the priority q
+    queue = [(end_hops[start_id], start_id, 0)]
+    while queue:
+        _, worker_id, cost = heapq.heappop(queue)
+        # entries are only pushed on improvement so anything costlier than dist is stale
+        # settled workers can't be improved on either so no visited set is needed
+        if cost > dist[worker_id]:
+            continue
+        if worker_id == end_id:
+            break
+        for n in neighbor_ids[worker_id]:
+            move_cost = cost + worker_costs[n] + 1
+            if move_cost < dist[n]:
+                dist[n] = move_cost
+                prev[n] = worker_id
+                heapq.heappush(queue, (move_cost + end_hops[n], n, move_cost))
+
+    return prev, dist
+
+
+def find_hop_paths(
+    start_id: WorkerId, neighbor_ids: List[Tuple[WorkerId, ...]]
+) -> Tuple[List[WorkerId], List[float], List[WorkerId]]:
+    """
+    Breadth first search from start where every move costs 1
+    Returns the predecessors and hop counts indexed by worker id (-1 and inf where unreachable)
+    along with the reachable worker ids in the order they were discovered
+    """
+    worker_count = len(neighbor_ids)
+    prev: List[WorkerId] = [-1] * worker_count
+    hops: List[float] = [inf] * worker_count
+    order: List[WorkerId] = [start_id]
+
+    hops[start_id] = 0
+    queue = deque([start_id])
+    while queue:
+        worker_id = queue.popleft()
+        move_cost = hops[worker_id] + 1
+        for n in neighbor_ids[worker_id]:
+            if hops[n] <= move_cost:
+                continue
+            hops[n] = move_cost
+            prev[n] = worker_id
+            order.append(n)
+            queue.append(n)
+
+    return prev, hops, order
+
+
+def is_tree(
+    start_id: WorkerId, neighbor_ids: List[Tuple[WorkerId, ...]], worker_count: int
+) -> bool:
+    """
+    The layout is a tree when every worker is reachable from start and there is one less link than workers
+    """
+    _, _, order = find_hop_paths(start_id, neighbor_ids)
+    link_count = sum(len(neighbors) for neighbors in neighbor_ids) // 2
+    return len(order) == worker_count and link_count == worker_count - 1
+
+
 class Simulator(ABC):
     """
     The simulator provides a step method which returns a list of commands given the provided state of the world
@@ -30,11 +112,11 @@ class TestSimulator(Simulator):
 
     def step(self, world: World) -> Collection[Command]:
         cmds: Dict[WorkerId, Command] = {}
-        for p in world.pearls.values():
-            if p.digested:
-                continue
-            worker = world.pearl_workers[p]
-            cmds[worker.id] = NomCommand(worker.id, p.id)
+        for worker in world.workers.values():
+            # each worker noms the first of its pearls which isn't digested yet
+            p = next((p for p in worker.pearls if not p.digested), None)
+            if p is not None:
+                cmds[worker.id] = NomCommand(worker.id, p.id)
         return cmds.values()
 
 
@@ -56,78 +138,116 @@ class AtlantisSimulator(Simulator):
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        # maps a pearl id to a list of commands
-        self.execution_plans: Dict[PearlId, List[Command]] = {}
-        # maps a worker id to the number of pending commands
-        self.worker_costs: Dict[WorkerId, int] = defaultdict(int)
-        # worker affinities considered during assignment
-        self.worker_affinities: Dict[WorkerId, int] = None
+        # maps a pearl id to a queue of commands
+        self.execution_plans: Dict[PearlId, Deque[Command]] = {}
+        # the number of pending commands indexed by worker id
+        self.worker_costs: List[int] = None
+        # worker affinities considered during assignment indexed by worker id
+        self.worker_affinities: List[int] = None
+        # the worker costs plus their affinities indexed by worker id
+        # this is kept in step with worker_costs so that planning only needs the one lookup
+        self.booking_costs: List[int] = None
+        # maps a worker id to its hop paths (see find_hop_paths)
+        # the layout of the world doesn't change between steps so these are only built once per worker
+        self.hop_paths: Dict[
+            WorkerId, Tuple[List[WorkerId], List[float], List[WorkerId]]
+        ] = {}
+        # whether the layout of the world is a tree in which case there is only ever one route between workers
+        self.is_tree = False
+        # whether debug logging is enabled, refreshed at the start of each step
+        self.debug_logging = False
 
     def step(self, world: World) -> Collection[Command]:
+        # the debug f-strings are evaluated even when debug logging is off so they are all guarded
+        self.debug_logging = self.logger.isEnabledFor(logging.DEBUG)
 
-        pearl_workers = world.get_pearls_with_workers()
-        self.logger.debug(
-            f"step: {len(pearl_workers)} pearls, {len(self.execution_plans)} execution plans"
-        )
-        for i, item in enumerate(pearl_workers.items()):
-            self.logger.debug(f"step: {i} Pearl: {item[0]}, Worker: {item[1]}")
+        if self.debug_logging:
+            self.logger.debug(
+                f"step: {len(world.pearls)} pearls, {len(self.execution_plans)} execution plans"
+            )
+            for i, item in enumerate(world.iter_pearl_workers()):
+                self.logger.debug(f"step: {i} Pearl: {item[0]}, Worker: {item[1]}")
 
         # It's a bit wonky do this here.
         # Longer term it may be useful to restructure things so that the world is updated rather than recreated each step.
         # Thhe simulator could then have a reference to the world provided at initialization and do this work then.
         if self.worker_affinities is None:
+            self.worker_costs = [0] * len(world.neighbor_ids)
             self.worker_affinities = self.create_worker_affinities(world)
+            self.booking_costs = list(self.worker_affinities)
+            self.is_tree = is_tree(
+                world.workers[0].id, world.neighbor_ids, len(world.workers)
+            )
 
-        # Build proposed commands for each worker based on state of their execution plans
-        proposed_cmds: Dict[WorkerId, List[Tuple(int, PearlId, Command)]] = defaultdict(
-            list
-        )
-        for pearl, worker in pearl_workers.items():
+        # local references for the loops below
+        execution_plans = self.execution_plans
+        worker_costs = self.worker_costs
+        booking_costs = self.booking_costs
+
+        # Build the proposed command for each worker based on state of their execution plans
+        # Only the top command is ever selected so we just keep the lowest (priority, pearl id) per worker
+        # along with the plan it came from
+        proposed_cmds: Dict[WorkerId, Tuple[float, PearlId, Deque[Command]]] = {}
+        for pearl, worker in world.iter_pearl_workers():
             # Get or create the execution plan
-            plan = self.execution_plans.get(pearl.id, None)
+            plan = execution_plans.get(pearl.id, None)
             if plan is None:
                 plan = self.create_execution_plan(pearl, worker, world)
                 # Book worker costs
                 for cmd in plan:
-                    self.worker_costs[cmd.worker_id] += 1
-                self.logger.debug(
-                    f"create_execution_plan: Worker costs {self.worker_costs}"
-                )
-                self.execution_plans[pearl.id] = plan
+                    worker_costs[cmd.worker_id] += cmd.remaining
+                    booking_costs[cmd.worker_id] += cmd.remaining
+                if self.debug_logging:
+                    self.logger.debug(
+                        f"create_execution_plan: Worker costs {worker_costs}"
+                    )
+                execution_plans[pearl.id] = plan
 
-            plan = self.execution_plans[pearl.id]
             cmd = plan[0]
 
             # Generate command priority
             priority = self.prioritize_command(cmd, pearl)
-            worker_cmds = proposed_cmds[cmd.worker_id]
-            heapq.heappush(worker_cmds, (priority, pearl.id, cmd))
-
-            self.logger.debug(
-                f"step: Pearl: {pearl}, Worker: {cmd.worker_id}, proposed: {cmd.to_json()}, priority: {priority}"
-            )
+            proposed = proposed_cmds.get(cmd.worker_id, None)
+            if (
+                proposed is None
+                or priority < proposed[0]
+                or (priority == proposed[0] and pearl.id < proposed[1])
+            ):
+                proposed_cmds[cmd.worker_id] = (priority, pearl.id, plan)
+
+            if self.debug_logging:
+                self.logger.debug(
+                    f"step: Pearl: {pearl}, Worker: {cmd.worker_id}, proposed: {cmd.to_json()}, priority: {priority}"
+                )
 
         # Select top commands for each worker
         selected_cmds: Dict[WorkerId, Command] = dict()
-        for worker_id, worker_cmds in proposed_cmds.items():
-            (priority, pearl_id, cmd) = heapq.heappop(worker_cmds)
+        for worker_id, (priority, pearl_id, plan) in proposed_cmds.items():
+            # Remove the command from the plan once it has been issued for all of its steps
+            cmd = plan[0]
+            if cmd.remaining > 1:
+                cmd.remaining -= 1
+            else:
+                plan.popleft()
             selected_cmds[worker_id] = cmd
 
             # For each selected command, substract its cost from the woker
-            self.worker_costs[worker_id] = max(0, self.worker_costs[worker_id] - 1)
-
-            # Remove the command from the plan
-            plan = self.execution_plans[pearl_id]
-            plan.pop(0)
+            if worker_costs[worker_id]:
+                worker_costs[worker_id] -= 1
+                booking_costs[worker_id] -= 1
 
-            self.logger.debug(
-                f"step: Pearl: {pearl_id}, Worker: {worker_id}, selected: {cmd.to_json()}, remaining cost: {self.worker_costs[worker_id]}, remaining steps: {len(plan)}"
-            )
+            if self.debug_logging:
+                self.logger.debug(
+                    f"step: Pearl: {pearl_id}, Worker: {worker_id}, selected: {cmd.to_json()}, remaining cost: {worker_costs[worker_id]}, remaining steps: {len(plan)}"
+                )
 
             # Pop the plan if when there are no more steps remaining
             if not plan:
-                self.execution_plans.pop(pearl_id)
-                self.logger.debug(f"step: Pearl: {pearl_id}, execution plan completed")
+                execution_plans.pop(pearl_id)
+                if self.debug_logging:
+                    self.logger.debug(
+                        f"step: Pearl: {pearl_id}, execution plan completed"
+                    )
 
         return selected_cmds.values()
 
@@ -139,38 +259,49 @@ class AtlantisSimulator(Simulator):
             no additional costs for moves
         NomCommands are ranked based on pearl thickness
         """
-        if isinstance(cmd, PassCommand):
-            priority = (
-                1.0 / pearl.remaining_thickness if pearl.remaining_thickness else 0
-            )
+        # remaining_thickness walks the layers so only evaluate it once
+        remaining_thickness = pearl.remaining_thickness
+        if cmd.is_pass:
+            priority = 1.0 / remaining_thickness if remaining_thickness else 0
         else:
-            priority = pearl.remaining_thickness
+            priority = remaining_thickness
         return priority
 
-    def create_worker_affinities(self, world: World) -> Dict[WorkerId, int]:
+    def create_worker_affinities(self, world: World) -> List[int]:
         """
         We use the distances from the root/gatekeeper to determine affinities
         The gatekeeper get a penalty equal to the distance to the furthest worker
         The furthest worker gets a penalty of 0
         """
-        _, move_costs = self.find_shortest_path(world, world.workers[0])
-        max_cost = max(move_costs.values())
-        worker_affinities = defaultdict(int)
-        for worker, cost in move_costs.items():
-            affinity = max_cost - cost
-            worker_affinities[worker.id] = affinity
-            self.logger.debug(f"Worker affinities: {worker.id} = {affinity}")
+        _, hops, order = self.get_hop_paths(world, world.workers[0])
+        max_cost = hops[order[-1]]
+        worker_affinities = [0] * len(world.neighbor_ids)
+        for worker_id in order:
+            affinity = max_cost - hops[worker_id]
+            worker_affinities[worker_id] = affinity
+            if self.debug_logging:
+                self.logger.debug(f"Worker affinities: {worker_id} = {affinity}")
         return worker_affinities
 
+    def get_hop_paths(
+        self, world: World, start: Worker
+    ) -> Tuple[List[WorkerId], List[float], List[WorkerId]]:
+        hop_paths = self.hop_paths.get(start.id, None)
+        if hop_paths is None:
+            hop_paths = find_hop_paths(start.id, world.neighbor_ids)
+            self.hop_paths[start.id] = hop_paths
+        return hop_paths
+
     def create_execution_plan(
         self, pearl: Pearl, worker: Worker, world: World
-    ) -> List[Command]:
+    ) -> Deque[Command]:
         """
-        Returns an execution plan (a list of commands) for the given pearl at the given worker
+        Returns an execution plan (a queue of commands) for the given pearl at the given worker
         """
-        self.logger.debug(
-            f"create_execution_plan: Pearl: ({pearl}), Worker: ({worker})"
-        )
+        if self.debug_logging:
+            self.logger.debug(
+                f"create_execution_plan: Pearl: ({pearl}), Worker: ({worker})"
+            )
 
         route: List[Worker] = []
         if pearl.digested:
@@ -185,143 +316,128 @@ class AtlantisSimulator(Simulator):
             # Find the route to the best worker
             route = self.select_best_worker_route(pearl, worker, world)
 
-        # Build the list of commands
+        # Build the queue of commands
         commands = self.create_commands_from_route(pearl, route)
         return commands
 
     def select_best_worker_route(
         self, pearl: Pearl, worker: Worker, world: World
-    ) -> List[WorkerId]:
+    ) -> List[Worker]:
         """
         Returns the best worker and a route to it
         """
         current_worker = worker
 
-        move_cost = 0
-        move_costs: Dict[Worker, int] = {worker: 0}
-        move_paths = {}
+        # the processing cost only depends on the type of worker so it is evaluated once per type
+        processing_costs: Dict[type, int] = {}
 
+        move_cost = 0
         processing_cost = worker.cost_pearl(pearl)
-        booking_cost = self.worker_costs[worker.id] + self.worker_affinities[worker.id]
+        processing_costs[type(worker)] = processing_cost
+        booking_cost = self.booking_costs[worker.id]
 
         best_cost = move_cost + processing_cost + booking_cost
         best_worker = worker
 
-        self.logger.debug(
-            f"create_execution_plan: Initial Cost: {best_cost}={move_cost}+{processing_cost}+{booking_cost}"
-        )
-
-        queue = [(move_cost, worker)]
-        while queue:
-            move_cost, worker = queue.pop(0)
+        if self.debug_logging:
             self.logger.debug(
-                f"create_execution_plan: Consider Worker: ({worker}), MoveCost: {move_cost}"
+                f"create_execution_plan: Initial Cost: {best_cost}={move_cost}+{processing_cost}+{booking_cost}"
             )
 
-            # skip this path if it is already exceeding the min cost we already have
-            if move_cost >= best_cost:
-                continue
-
-            neighbors = world.worker_neighbors[worker]
-            move_cost = move_cost + 1
+        # every move costs 1 so the workers can be visited in their breadth first order
+        prev, hops, order = self.get_hop_paths(world, worker)
+        for worker_id in order[1:]:
+            move_cost = hops[worker_id]
 
-            for n in neighbors:
-                # if we previously found a cheaper path to this worker then skip this path
-                old_move_cost = move_costs.get(n, inf)
-                if old_move_cost <= move_cost:
-                    continue
-
-                # save the best path to this worker
-                move_paths[n] = worker
-                move_costs[n] = move_cost
-                queue.append((move_cost, n))
+            # the remaining workers are at least this far away so none can beat the min cost we already have
+            if move_cost >= best_cost:
+                break
 
+            n = world.workers[worker_id]
+            processing_cost = processing_costs.get(type(n), None)
+            if processing_cost is None:
                 processing_cost = n.cost_pearl(pearl)
-                booking_cost = self.worker_costs[n.id] + self.worker_affinities[n.id]
+                processing_costs[type(n)] = processing_cost
+            booking_cost = self.booking_costs[worker_id]
 
-                total_cost = processing_cost + move_cost + booking_cost
+            total_cost = processing_cost + move_cost + booking_cost
+            if self.debug_logging:
                 self.logger.debug(
                     f"create_execution_plan: Evaluate Neighbor: ({n}), Cost: {total_cost}={move_cost}+{processing_cost}+{booking_cost}"
                 )
 
-                if total_cost < best_cost:
-                    best_cost = total_cost
-                    best_worker = n
+            if total_cost < best_cost:
+                best_cost = total_cost
+                best_worker = n
+                if self.debug_logging:
                     self.logger.debug(
                         f"create_execution_plan: Found Best: ({best_worker}), Cost: {best_cost}"
                     )
 
-        self.logger.debug(
-            f"create_execution_plan: Selected Best: ({best_worker}), Cost: {best_cost}"
+        if self.debug_logging:
+            self.logger.debug(
+                f"create_execution_plan: Selected Best: ({best_worker}), Cost: {best_cost}"
+            )
+        route = AtlantisSimulator.create_route(
+            current_worker.id, best_worker.id, prev, world.workers
         )
-        route = AtlantisSimulator.create_route(current_worker, best_worker, move_paths)
         return route
 
-    def find_route(self, start: Worker, end: Worker, world: World) -> List[WorkerId]:
-        move_paths, _ = self.find_shortest_path(world, start, end)
-        route = AtlantisSimulator.create_route(start, end, move_paths)
+    def find_route(self, start: Worker, end: Worker, world: World) -> List[Worker]:
+        if self.is_tree:
+            # the only route is the one back along the hop paths from end so the costs don't matter
+            prev, _, _ = self.get_hop_paths(world, end)
+            route_ids = [start.id]
+            while route_ids[-1] != end.id:
+                route_ids.append(prev[route_ids[-1]])
+            return [world.workers[worker_id] for worker_id in route_ids]
+
+        # unlike the hop paths this accounts for the booked worker costs
+        prev, _ = self.find_shortest_path(world, start, end)
+        route = AtlantisSimulator.create_route(start.id, end.id, prev, world.workers)
         return route
 
     def find_shortest_path(
         self,
         world: World,
         start: Worker,
-        end: Optional[Worker] = None,
-    ) -> Tuple[Dict[Worker, Worker], Dict[Worker, int]]:
-
-        # find path from start to end using a simple heapq based Dijsktra implementation
-        # A*star doesn't feel like a candidate because there isn't an intuitive heuristic
-        move_costs: Dict[Worker, int] = {start: 0}
-        move_paths: Dict[Worker, Worker] = {}
-
-        visited: Set[WorkerId] = set()
-        # Use the cost and integer id for the priority q
-        queue = [(0, start.id)]
-        while queue:
-            cost, worker_id = heapq.heappop(queue)
-            if worker_id not in visited:
-                visited.add(worker_id)
-                if end and worker_id == end.id:
-                    break
-                worker = world.workers[worker_id]
-                neighbors = world.worker_neighbors[worker]
-                for n in neighbors:
-                    if n.id in visited:
-                        continue
-                    move_cost = cost + self.worker_costs.get(n.id, 0) + 1
-                    last_move_cost = move_costs.get(n.id, inf)
-                    if move_cost < last_move_cost:
-                        move_costs[n] = move_cost
-                        move_paths[n] = worker
-                        heapq.heappush(queue, (move_cost, n.id))
-
-        return move_paths, move_costs
+        end: Worker,
+    ) -> Tuple[List[WorkerId], List[float]]:
+        # the layout is undirected so the hops from end are also the hops to end
+        _, end_hops, _ = self.get_hop_paths(world, end)
+        return find_shortest_paths(
+            start.id, end.id, world.neighbor_ids, self.worker_costs, end_hops
+        )
 
     @staticmethod
     def create_route(
-        start: Worker, end: Worker, paths: Dict[Worker, Worker]
+        start_id: WorkerId,
+        end_id: WorkerId,
+        prev: List[WorkerId],
+        workers: Dict[WorkerId, Worker],
     ) -> List[Worker]:
-        # build a route from start to end from the provided backtracked path mappings
-        route = [end]
-        iterator = end
-        while iterator != start:
-            worker = paths[iterator]
-            route.insert(0, worker)
-            iterator = worker
-        return route
+        # build a route from start to end from the provided predecessor ids
+        # the ids are walked backwards from end and only resolved to workers once reversed
+        # predecessors are -1 where unset which means end can't be reached from start
+        route_ids = [end_id]
+        while route_ids[-1] != start_id:
+            worker_id = prev[route_ids[-1]]
+            if worker_id < 0:
+                raise ValueError(f"No route from worker {start_id} to worker {end_id}")
+            route_ids.append(worker_id)
+        return [workers[worker_id] for worker_id in reversed(route_ids)]
 
     @staticmethod
-    def create_commands_from_route(pearl: Pearl, route: List[Worker]) -> List[Command]:
-        cmds = []
+    def create_commands_from_route(pearl: Pearl, route: List[Worker]) -> Deque[Command]:
+        cmds = deque()
         current = route[0]
         for w in route[1:]:
             cmd = PassCommand(current.id, pearl.id, w.id)
             cmds.append(cmd)
             current = w
         if not pearl.digested:
-            # queue required number of nom commands at destination worker
+            # queue a single nom command at destination worker for the required number of steps
             nom_steps = current.cost_pearl(pearl)
-            for _ in range(nom_steps):
-                cmd = NomCommand(current.id, pearl.id)
-                cmds.append(cmd)
+            if nom_steps > 0:
+                cmds.append(NomCommand(current.id, pearl.id, nom_steps))
         return cmds
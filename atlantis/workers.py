@@ -1,14 +1,15 @@
 from abc import abstractmethod, ABC
-from math import ceil
-from typing import Collection, Dict
+from typing import Collection, Tuple
 
-from .pearls import Pearl, PearlColor, PearlLayer
+from .pearls import Pearl, PearlLayer
 
 
 WorkerId = int
 
 
 class Worker(ABC):
+    __slots__ = ("id", "pearls")
+
     def __init__(self, id: WorkerId, pearls: Collection[Pearl] = None):
         self.id = id
         self.pearls = pearls
@@ -18,12 +19,17 @@ class Worker(ABC):
 
     @property
     @abstractmethod
-    def processing_rate(self) -> Dict[PearlColor, int]:
+    def processing_rate(self) -> Tuple[int, int, int]:
+        """
+        The thickness processed per step indexed by PearlColor
+        Subclasses provide this as a class level tuple
+        """
         pass
 
     def cost_layer(self, pearl_layer: PearlLayer) -> int:
-        processing_cost = ceil(
-            (pearl_layer.thickness * 1.0) / self.processing_rate[pearl_layer.color]
+        # integer ceiling division
+        processing_cost = -(
+            -pearl_layer.thickness // self.processing_rate[pearl_layer.color]
         )
         return processing_cost
 
@@ -32,30 +38,21 @@ class Worker(ABC):
 
 
 class GeneralWorker(Worker):
-    @property
-    def processing_rate(self) -> Dict[PearlColor, int]:
-        return {
-            PearlColor.Red: 1,
-            PearlColor.Green: 1,
-            PearlColor.Blue: 1,
-        }
+    __slots__ = ()
+
+    # Red, Green, Blue
+    processing_rate = (1, 1, 1)
 
 
 class VectorWorker(Worker):
-    @property
-    def processing_rate(self) -> Dict[PearlColor, int]:
-        return {
-            PearlColor.Red: 1,
-            PearlColor.Green: 5,
-            PearlColor.Blue: 2,
-        }
+    __slots__ = ()
+
+    # Red, Green, Blue
+    processing_rate = (1, 5, 2)
 
 
 class MatrixWorker(Worker):
-    @property
-    def processing_rate(self) -> Dict[PearlColor, int]:
-        return {
-            PearlColor.Red: 1,
-            PearlColor.Green: 2,
-            PearlColor.Blue: 10,
-        }
+    __slots__ = ()
+
+    # Red, Green, Blue
+    processing_rate = (1, 2, 10)
@@ -1,6 +1,5 @@
-from collections import OrderedDict, defaultdict
-from typing import Collection, Dict, List, Set, Tuple
-from operator import attrgetter
+from collections import defaultdict
+from typing import Collection, Dict, Iterator, List, Set, Tuple
 
 from .pearls import PearlColor, PearlId, PearlLayer, Pearl
 from .workers import Worker, GeneralWorker, MatrixWorker, VectorWorker, WorkerId
@@ -24,28 +23,26 @@ class World:
         self.score = score
         self.worker_neighbor_map = worker_neighbor_map
 
-        worker_neighbors: Dict[Worker, Set[Worker]] = defaultdict(set)
+        worker_neighbors: Dict[WorkerId, Set[WorkerId]] = defaultdict(set)
         for worker_id, neighbor_worker_id in worker_neighbor_map:
-            worker = workers[worker_id]
-            neighbor = workers[neighbor_worker_id]
-            worker_neighbors[worker].add(neighbor)
-            worker_neighbors[neighbor].add(worker)
+            worker_neighbors[worker_id].add(neighbor_worker_id)
+            worker_neighbors[neighbor_worker_id].add(worker_id)
 
-        # build a sorted list of neighbors for each worker
-        # the intent is to ensure that we iterate deterministically
-        self.worker_neighbors = OrderedDict(
-            {
-                w: sorted(neighbors, key=attrgetter("id"))
-                for w, neighbors in worker_neighbors.items()
-            }
+        # build a sorted tuple of neighbor ids indexed by worker id
+        # the intent is to ensure that we iterate deterministically and keep the path finding loops on plain integers
+        self.neighbor_ids: List[Tuple[WorkerId, ...]] = [()] * (
+            max(workers, default=-1) + 1
         )
+        for w, neighbors in worker_neighbors.items():
+            self.neighbor_ids[w] = tuple(sorted(neighbors))
 
-    def get_pearls_with_workers(self):
-        pearl_workers: Dict[Pearl, Worker] = {}
+    def iter_pearl_workers(self) -> Iterator[Tuple[Pearl, Worker]]:
+        """
+        Yields each pearl along with the worker holding it
+        """
         for worker in self.workers.values():
             for p in worker.pearls:
-                pearl_workers[p] = worker
-        return pearl_workers
+                yield p, worker
 
     @classmethod
     def create_from(cls, json: Dict) -> "World":
@@ -53,8 +50,8 @@ class World:
         Create the world from the provided json payload
         """
         # for each worker, get the flavor, create the appropriate type, then for each pearl, create the layer
-        workers: Dict[int, Worker] = OrderedDict()
-        pearls: Dict[int, Pearl] = OrderedDict()
+        workers: Dict[int, Worker] = {}
+        pearls: Dict[int, Pearl] = {}
         for worker in json["workers"]:
             desk: List[Pearl] = []
             for pearl in worker["desk"]:
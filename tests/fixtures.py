@@ -1,17 +1,15 @@
-import json
 import logging
 
+from atlantis import serialization
 from atlantis.config import Config
 from atlantis.simulators import TestSimulator, AtlantisSimulator
 from atlantis.world import World
-from atlantis.util import render_world
 
 if __name__ == "__main__":
 
     config = Config.initialize(
         default_log_file="debug.log",
         default_log_level=logging.DEBUG,
-        default_enable_render=True,
     )
     logger = logging.getLogger()
 
@@ -49,14 +47,16 @@ if __name__ == "__main__":
 
     s = AtlantisSimulator()
     for i, script in enumerate(test_scripts):
-        j = json.loads(script)
+        j = serialization.loads(script)
         w = World.create_from(j)
         if config.enable_render:
+            from atlantis.util import render_world
+
             render_world(w, f"./{config.output_path}/debug-{i}.png")
 
         commands = s.step(w)
         output = {}
         for c in commands:
-            output.update(c.to_json())
-        output = json.dumps(output)
-        logger.info(output)
+            c.apply(output)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(serialization.dumps(output).decode())
@@ -0,0 +1,140 @@
+import unittest
+
+from math import inf
+from unittest import mock
+
+from atlantis.commands import NomCommand
+from atlantis.simulators import (
+    AtlantisSimulator,
+    TestSimulator,
+    find_hop_paths,
+    find_shortest_paths,
+    is_tree,
+)
+from atlantis.world import World
+
+
+def create_world(desks, neighbor_map):
+    # builds a world of general workers with the given desks
+    workers = [
+        {"id": i, "flavor": "General", "desk": desk} for i, desk in enumerate(desks)
+    ]
+    return World.create_from(
+        {"workers": workers, "neighbor_map": neighbor_map, "score": 0}
+    )
+
+
+class TestSimulators(unittest.TestCase):
+    # 0 - 1 - 3 - 4 and 0 - 2 - 4
+    neighbor_ids = [[1, 2], [0, 3], [0, 4], [1, 4], [2, 3], []]
+
+    def test_find_hop_paths(self):
+        prev, hops, order = find_hop_paths(0, self.neighbor_ids)
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+        self.assertEqual(hops, [0, 1, 1, 2, 2, inf])
+        self.assertEqual(prev, [-1, 0, 0, 1, 2, -1])
+
+    def test_find_shortest_paths(self):
+        # without bookings the lower id wins the tie
+        prev, dist = find_shortest_paths(0, 4, self.neighbor_ids, [0] * 6)
+        self.assertEqual(prev[4], 2)
+        self.assertEqual(dist[4], 2)
+
+        # a busy worker is routed around
+        prev, dist = find_shortest_paths(0, 4, self.neighbor_ids, [0, 0, 5, 0, 0, 0])
+        self.assertEqual(prev[4], 3)
+        self.assertEqual(prev[3], 1)
+        self.assertEqual(dist[4], 3)
+
+        # the hop counts to the end guide the search without changing the result
+        _, end_hops, _ = find_hop_paths(4, self.neighbor_ids)
+        prev, dist = find_shortest_paths(
+            0, 4, self.neighbor_ids, [0, 0, 5, 0, 0, 0], end_hops
+        )
+        self.assertEqual(prev[4], 3)
+        self.assertEqual(prev[3], 1)
+        self.assertEqual(dist[4], 3)
+
+    def test_is_tree(self):
+        # the loop through 0 - 1 - 3 - 4 - 2 means there are two routes between its workers
+        self.assertFalse(is_tree(0, self.neighbor_ids, 5))
+
+        # 0 - 1 - 3 and 0 - 2 - 4
+        self.assertTrue(is_tree(0, [[1, 2], [0, 3], [0, 4], [1], [2], []], 5))
+
+        # 4 can't be reached
+        self.assertFalse(is_tree(0, [[1, 2], [0, 3], [0], [1], []], 5))
+
+    def test_test_simulator(self):
+        digested = {"id": 1, "layers": [{"color": "Red", "thickness": 0}]}
+        first = {"id": 2, "layers": [{"color": "Red", "thickness": 2}]}
+        other = {"id": 3, "layers": [{"color": "Blue", "thickness": 1}]}
+        world = create_world([[digested, first], [other]], [[0, 1]])
+
+        # each worker noms its first pearl which isn't digested yet
+        cmds = [c.to_json() for c in TestSimulator().step(world)]
+        self.assertEqual(cmds, [{0: {"Nom": 2}}, {1: {"Nom": 3}}])
+
+
+class TestAtlantisSimulator(unittest.TestCase):
+    def test_step_nom_command(self):
+        sim = AtlantisSimulator()
+        nom = None
+        # a general worker noms a thickness of 1 each step
+        for thickness in (3, 2, 1):
+            pearl = {"id": 7, "layers": [{"color": "Red", "thickness": thickness}]}
+            cmds = list(sim.step(create_world([[pearl]], [])))
+
+            # the same nom command is issued on consecutive steps
+            self.assertEqual(len(cmds), 1)
+            self.assertIsInstance(cmds[0], NomCommand)
+            self.assertEqual(cmds[0].to_json(), {0: {"Nom": 7}})
+            if nom is None:
+                nom = cmds[0]
+            self.assertIs(cmds[0], nom)
+
+            # the worker stays booked for the steps which remain
+            self.assertEqual(sim.worker_costs[0], thickness - 1)
+            if thickness > 1:
+                self.assertEqual(list(sim.execution_plans[7]), [nom])
+                self.assertEqual(nom.remaining, thickness - 1)
+
+        # the plan is removed once the count runs out
+        self.assertNotIn(7, sim.execution_plans)
+        self.assertEqual(sim.worker_costs, [0])
+
+    def test_find_route_in_tree(self):
+        # 0 - 1 - 2 and 0 - 3
+        pearl = {"id": 7, "layers": [{"color": "Red", "thickness": 0}]}
+        world = create_world([[], [], [pearl], []], [[0, 1], [1, 2], [0, 3]])
+        sim = AtlantisSimulator()
+        sim.step(create_world([[], [], [], []], [[0, 1], [1, 2], [0, 3]]))
+        self.assertTrue(sim.is_tree)
+
+        # book the only way back so that a cost based search would still have to take it
+        sim.worker_costs[1] = 5
+        sim.booking_costs[1] += 5
+
+        # the tree route is walked without any search
+        with mock.patch.object(sim, "find_shortest_path", side_effect=AssertionError):
+            route = sim.find_route(world.workers[2], world.workers[0], world)
+            cmds = list(sim.step(world))
+
+        # the route follows the hop predecessors back to the gatekeeper
+        prev, _, _ = sim.hop_paths[0]
+        self.assertEqual([w.id for w in route], [2, prev[2], prev[prev[2]]])
+        self.assertEqual([w.id for w in route], [2, 1, 0])
+        self.assertEqual(
+            [c.to_json() for c in cmds],
+            [{2: {"Pass": {"pearl_id": 7, "to_worker": 1}}}],
+        )
+
+    def test_find_route_disconnected(self):
+        # 0 - 1 - 4 - 0 and 2 - 3 aren't linked
+        pearl = {"id": 7, "layers": [{"color": "Red", "thickness": 0}]}
+        world = create_world(
+            [[], [], [], [pearl], []], [[0, 1], [1, 4], [4, 0], [2, 3]]
+        )
+        sim = AtlantisSimulator()
+        with self.assertRaises(ValueError):
+            sim.step(world)
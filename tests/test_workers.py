@@ -1,39 +1,36 @@
 import unittest
 
 from atlantis.pearls import Pearl, PearlColor, PearlLayer
-from atlantis.workers import GeneralWorker, VectorWorker, MatrixWorker
+from atlantis.workers import Worker, GeneralWorker, VectorWorker, MatrixWorker
 
 
 class TestWorkers(unittest.TestCase):
-    def test_worker_costs(self):
-        g = GeneralWorker(0)
-        v = VectorWorker(1)
-        m = MatrixWorker(2)
-
-        # test costing
-        p = Pearl(0, [PearlLayer(PearlColor.Green, 10)])
-        self.assertEqual(g.cost_pearl(p), 10)
-        self.assertEqual(v.cost_pearl(p), 2)
-        self.assertEqual(m.cost_pearl(p), 5)
+    # the layers of each pearl along with its general, vector and matrix costs
+    cases = (
+        ("test costing", ((PearlColor.Green, 10),), (10, 2, 5)),
+        ("test ceiling", ((PearlColor.Green, 11),), (11, 3, 6)),
+        (
+            "test two layers",
+            ((PearlColor.Green, 11), (PearlColor.Blue, 10)),
+            (11 + 10, 3 + 5, 6 + 1),
+        ),
+        (
+            "test two similar layers",
+            ((PearlColor.Green, 11), (PearlColor.Green, 10)),
+            (11 + 10, 3 + 2, 6 + 5),
+        ),
+    )
 
-        # test ceiling
-        p = Pearl(0, [PearlLayer(PearlColor.Green, 11)])
-        self.assertEqual(g.cost_pearl(p), 11)
-        self.assertEqual(v.cost_pearl(p), 3)
-        self.assertEqual(m.cost_pearl(p), 6)
-
-        # test two layers
-        p = Pearl(
-            0, [PearlLayer(PearlColor.Green, 11), PearlLayer(PearlColor.Blue, 10)]
-        )
-        self.assertEqual(g.cost_pearl(p), 11 + 10)
-        self.assertEqual(v.cost_pearl(p), 3 + 5)
-        self.assertEqual(m.cost_pearl(p), 6 + 1)
+    def test_worker_costs(self):
+        workers = (GeneralWorker(0), VectorWorker(1), MatrixWorker(2))
+        for name, layers, costs in self.cases:
+            with self.subTest(name):
+                p = Pearl(
+                    0, [PearlLayer(color, thickness) for color, thickness in layers]
+                )
+                self.assertEqual(tuple(w.cost_pearl(p) for w in workers), costs)
 
-        # test two similar layers
-        p = Pearl(
-            0, [PearlLayer(PearlColor.Green, 11), PearlLayer(PearlColor.Green, 10)]
-        )
-        self.assertEqual(g.cost_pearl(p), 11 + 10)
-        self.assertEqual(v.cost_pearl(p), 3 + 2)
-        self.assertEqual(m.cost_pearl(p), 6 + 5)
+    def test_worker_is_abstract(self):
+        # the processing rates are only provided by the worker flavors
+        with self.assertRaises(TypeError):
+            Worker(0)